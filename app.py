@@ -1,12 +1,29 @@
 import streamlit as st
 import pandas as pd
 import openpyxl
+from openpyxl.comments import Comment
 from openpyxl.styles import PatternFill
+from openpyxl.utils import get_column_letter
+import atexit
 import io
+import math
+import os
 import re
-from textblob import TextBlob
+import time
+import weakref
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from spellchecker import SpellChecker
 
+import spell_check
+from spell_check import CachedSpellChecker, check_spelling_and_grammar
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:  # Optional faster reader; openpyxl is used without it
+    CalamineWorkbook = None
+
 # Configure the page
 st.set_page_config(
     page_title="Excel Spell & Grammar Checker",
@@ -14,164 +31,434 @@ st.set_page_config(
     layout="wide"
 )
 
+# Workbooks with fewer distinct texts than this are checked in-process.
+# A text takes about 7µs to check and a round trip to the worker pool
+# 0.5-2ms, so below this the whole check is a few tens of ms and not worth
+# handing off.
+PARALLEL_MIN_TEXTS = 5000
+
+# CPUs this process may actually run on; os.cpu_count() counts every core
+# of the host, including ones the process or its container can't use
+if hasattr(os, "sched_getaffinity"):
+    MAX_WORKERS = len(os.sched_getaffinity(0))
+else:
+    MAX_WORKERS = os.cpu_count() or 1
+
+# Texts for each worker are split into this many chunks, so progress moves
+# as chunks finish
+CHUNKS_PER_WORKER = 4
+
+# Largest sheet area (rows x columns, counted from A1) read with calamine.
+# calamine builds a dense grid over the whole area however few cells are
+# filled: a sheet with cells at A1 and AX1000000 took 2.1 GB, against an
+# extra 80 MB at this size. Bigger or unsized sheets are streamed by openpyxl.
+CALAMINE_MAX_CELLS = 2_000_000
+
+# Seconds between progress updates while a check runs in the background
+PROGRESS_INTERVAL = 0.05
+
+# Checks that can run in the background at once, across all sessions;
+# further checks wait for a free thread
+JOB_THREADS = 4
+
+# Seconds a check keeps running without the page polling it. When the tab
+# is closed or the script is stopped nothing polls any more, and the check
+# gives its thread back instead of blocking other sessions' checks.
+JOB_ABANDON_AFTER = 5
+
+# Rows scanned or texts checked between looking for cancellation
+CANCEL_CHECK_EVERY = 1000
+
+# Author shown on the comments added to flagged cells
+COMMENT_AUTHOR = "Spell Checker"
+
+# Matches text that is only a number (including currency and percentages)
+# or a date; compiled once as it runs on every cell
+_SKIP_RE = re.compile(r'^(?:[\d\.\,\-\+\%\$\€\£\¥]+|\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})$')
+
+class CheckCancelled(Exception):
+    """Raised in a background check whose results are no longer wanted"""
+
+def raise_if_cancelled(progress):
+    """Stop a background check that was cancelled or that nothing is polling"""
+    if progress.get("cancelled"):
+        raise CheckCancelled()
+    
+    # "seen" is set by the page each time it polls the check
+    seen = progress.get("seen")
+    if seen is not None and time.monotonic() - seen > JOB_ABANDON_AFTER:
+        raise CheckCancelled()
+
 # Initialize spell checker
 @st.cache_resource
 def load_spell_checker():
     """Load the spell checker"""
     try:
-        return SpellChecker()
+        spell_checker = CachedSpellChecker(SpellChecker())
+        # Check it works once here, so per-cell checks can call it directly
+        spell_checker.unknown(["This", "are", "wrong"])
+        return spell_checker
     except Exception as e:
         st.error(f"Error loading spell checker: {e}")
         return None
 
-def is_text_content(value):
-    """Check if a cell contains text content worth checking"""
-    if pd.isna(value) or value == "":
-        return False
+def normalize_text(value):
+    """Return the stripped text of a cell worth checking, or None"""
+    # Only strings hold text; numbers, dates and empty cells never do
+    if not isinstance(value, str):
+        return None
     
-    # Convert to string and check if it's meaningful text
-    text = str(value).strip()
+    text = value.strip()
     
-    # Skip if it's just numbers, dates, or very short text
+    # Skip very short text
     if len(text) < 2:
-        return False
-    
-    # Skip if it's purely numeric
-    if re.match(r'^[\d\.\,\-\+\%\$\€\£\¥]+$', text):
-        return False
+        return None
     
-    # Skip if it's a date format
-    if re.match(r'^\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4}$', text):
-        return False
+    # Numbers and dates never start with a letter, so most text is settled
+    # here without running _SKIP_RE
+    if text[0].isalpha():
+        return text
     
-    return True
+    # Skip text that is just a number or a date
+    return None if _SKIP_RE.match(text) else text
 
-def check_spelling_and_grammar(text, spell_checker):
-    """Check text for spelling and grammar issues"""
-    issues = []
-    
-    # Clean the text for checking
-    text_clean = re.sub(r'[^\w\s\'\-]', ' ', text)
-    words = text_clean.lower().split()
+def _shutdown_worker_pool(pool_ref):
+    """Stop a worker pool at exit, dropping checks that haven't started"""
+    executor = pool_ref()
+    if executor is not None:
+        executor.shutdown(cancel_futures=True)
+
+# Keyed on when spell_check.py last changed, so editing it replaces workers
+# still running the old code; the replaced pool shuts down once it is
+# garbage collected.
+@st.cache_resource(max_entries=1, show_spinner=False)
+def load_worker_pool(code_version):
+    """Start the worker processes used to check large workbooks"""
+    # Workers are spawned rather than forked, since forking the threaded
+    # Streamlit server can deadlock, and import the checks from spell_check.
+    # The pool is kept alive across reruns and sessions so each worker loads
+    # its dictionary once rather than on every check.
+    executor = ProcessPoolExecutor(
+        max_workers=MAX_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=spell_check.init_worker
+    )
+    atexit.register(_shutdown_worker_pool, weakref.ref(executor))
+    return executor
+
+def check_texts(texts, spell_checker, progress):
+    """Check a list of texts, spread over worker processes for large workbooks"""
+    results = []
     
-    # Spelling check with pyspellchecker
-    if spell_checker:
+    # Handing work to other processes has a cost, so only fan out when there
+    # is more than one CPU to spread it over and enough texts to pay for it
+    if MAX_WORKERS >= 2 and len(texts) >= PARALLEL_MIN_TEXTS:
+        worker_pool = load_worker_pool(os.path.getmtime(spell_check.__file__))
+        # Evenly sized chunks, however the texts are spread over the sheets
+        chunk_size = math.ceil(len(texts) / (MAX_WORKERS * CHUNKS_PER_WORKER))
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
         try:
-            misspelled = spell_checker.unknown(words)
-            if misspelled:
-                issues.append(f"Possible misspelled words: {', '.join(list(misspelled)[:3])}")
-        except Exception:
-            pass
+            # Stopping early cancels the chunks that haven't started
+            for chunk_issues in worker_pool.map(spell_check.check_batch, chunks):
+                raise_if_cancelled(progress)
+                results.extend(chunk_issues)
+                progress["fraction"] = len(results) / len(texts)
+            return results
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool next time and finish here
+            load_worker_pool.clear()
+            results = []
     
-    # Basic grammar check with TextBlob
+    for i, text in enumerate(texts):
+        if i % CANCEL_CHECK_EVERY == 0:
+            raise_if_cancelled(progress)
+        progress["fraction"] = i / len(texts)
+        results.append(check_spelling_and_grammar(text, spell_checker))
+    
+    return results
+
+def _fits_calamine(max_row, max_column):
+    """Check if a sheet of this size (from its <dimension> tag) can go to calamine"""
+    # A missing tag gives no size. A bare "A1" is what some writers put when
+    # they don't track the size, so it can't be trusted either.
+    if not max_row or not max_column or max_row * max_column == 1:
+        return False
+    return max_row * max_column <= CALAMINE_MAX_CELLS
+
+def iter_sheet_values(file_bytes):
+    """Yield (sheet name, row count, rows of cell values) for each worksheet"""
+    # Open the workbook in read-only mode: sheets are only parsed when their
+    # rows are read, but their size is known up front from the <dimension>
+    # tag. Only cell values are needed, so external links are not loaded
+    # either.
+    workbook = openpyxl.load_workbook(
+        io.BytesIO(file_bytes), read_only=True, data_only=True, keep_links=False
+    )
+    calamine_workbook = None
+    if CalamineWorkbook is not None:
+        calamine_workbook = CalamineWorkbook.from_filelike(io.BytesIO(file_bytes))
     try:
-        blob = TextBlob(text)
+        for sheet in workbook.worksheets:
+            max_row, max_column = sheet.max_row, sheet.max_column
+            
+            if calamine_workbook is not None and _fits_calamine(max_row, max_column):
+                # calamine parses the sheet in Rust into a grid of its used
+                # area; rows are padded from A1 so positions line up with
+                # openpyxl's row/column numbers
+                rows = calamine_workbook.get_sheet_by_name(sheet.title).to_python(skip_empty_area=False)
+                yield sheet.title, len(rows), rows
+                continue
+            
+            # Otherwise stream the rows, parsing and discarding them as we go
+            # instead of building the whole sheet in memory. The read-only
+            # reader stops at the <dimension> tag, which some writers leave
+            # wrong, so read every row that is actually there. The tag (if
+            # any) is still good enough as a progress hint.
+            sheet.reset_dimensions()
+            yield sheet.title, max_row, sheet.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+        if calamine_workbook is not None:
+            calamine_workbook.close()
+
+def scan_sheet(sheet_rows, max_row, progress):
+    """Collect the (row, col, text) cells of a sheet that are worth checking"""
+    sheet_candidates = []
+    
+    # Read raw values row by row. Empty cells (None from openpyxl, "" from
+    # calamine's padded grid) and non-string cells are dropped inline before
+    # calling normalize_text; in sparse or numeric sheets they are most of
+    # what the reader yields.
+    for row, values in enumerate(sheet_rows, start=1):
+        if row % CANCEL_CHECK_EVERY == 0:
+            raise_if_cancelled(progress)
         
-        # Check for very basic grammar issues
-        # Multiple consecutive spaces
-        if re.search(r'\s{2,}', text):
-            issues.append("Multiple consecutive spaces found")
+        # Update progress; the page picks it up every PROGRESS_INTERVAL seconds.
+        # max_row is None when the sheet's size isn't known up front.
+        if max_row:
+            progress["fraction"] = min(row / max_row, 1.0)
         
-        # Missing capitalization at start of sentence
-        sentences = blob.sentences
-        for sentence in sentences:
-            sentence_str = str(sentence).strip()
-            if sentence_str and sentence_str[0].islower():
-                # Check if it's not an intentional lowercase start (like an acronym)
-                if len(sentence_str.split()) > 1:
-                    issues.append("Sentence may need capitalization")
-                break  # Only report once per cell
+        for col, value in enumerate(values, start=1):
+            if value and isinstance(value, str):
+                text = normalize_text(value)
+                if text is not None:
+                    sheet_candidates.append((row, col, text))
+    
+    progress["fraction"] = 1.0
+    return sheet_candidates
+
+# Keyed on the file contents, so checking the same upload again skips parsing.
+# The leading underscore keeps _progress out of the cache key.
+@st.cache_data(max_entries=8, show_spinner=False)
+def extract_candidates(file_bytes, _progress=None):
+    """Collect the (row, col, text) candidates of each worksheet"""
+    progress = {} if _progress is None else _progress
+    
+    candidates = {}
+    for sheet_name, max_row, sheet_rows in iter_sheet_values(file_bytes):
+        progress["label"] = f"Processing sheet: {sheet_name}"
+        progress["fraction"] = 0.0
         
-        # Check for repeated words
-        words_in_text = text.lower().split()
-        for i in range(len(words_in_text) - 1):
-            if words_in_text[i] == words_in_text[i + 1] and len(words_in_text[i]) > 2:
-                issues.append("Repeated word detected")
-                break  # Only report once per cell
-                
-    except Exception:
-        pass
+        candidates[sheet_name] = scan_sheet(sheet_rows, max_row, progress)
     
-    return issues
+    return candidates
 
-def process_workbook(uploaded_file, spell_checker):
-    """Process the Excel workbook and highlight cells with issues"""
+def apply_issues(sheet, flagged_cells, fill):
+    """Highlight the flagged (row, col, comment text) cells of a sheet"""
+    for row, col, comment_text in flagged_cells:
+        # Highlight the cell
+        cell = sheet.cell(row=row, column=col)
+        cell.fill = fill
+        
+        # Add comment with issues
+        if cell.comment:
+            existing_comment = cell.comment.text
+            cell.comment.text = f"{existing_comment}\n\n{comment_text}"
+        else:
+            cell.comment = Comment(text=comment_text, author=COMMENT_AUTHOR)
+
+def process_workbook(file_bytes, spell_checker, progress=None):
+    """Process the Excel workbook and return a highlighted copy of it"""
     
-    # Load the workbook
-    workbook = openpyxl.load_workbook(uploaded_file, data_only=False)
+    # Shared with the page, which shows {"label", "fraction"} while this runs,
+    # sets "seen" each time it polls and "cancelled" once the results are no
+    # longer wanted
+    if progress is None:
+        progress = {}
     
     # Yellow fill for highlighting issues
     yellow_fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
     
-    issues_found = []
-    total_checked = 0
+    # Issue list kept column by column, ready for a DataFrame
+    issues_found = {'Sheet': [], 'Cell': [], 'Text': [], 'Issues': []}
+    
+    # Collect the (row, col, text) candidates of each worksheet
+    candidates = extract_candidates(file_bytes, _progress=progress)
+    total_checked = sum(len(sheet_candidates) for sheet_candidates in candidates.values())
+    
+    # Check each distinct text once
+    unique_texts = list(dict.fromkeys(
+        text for sheet_candidates in candidates.values() for _, _, text in sheet_candidates
+    ))
+    progress["label"] = f"Checking {len(unique_texts)} distinct texts"
+    progress["fraction"] = 0.0
+    
+    # Build the comment and summary for each flagged text once, however many
+    # cells share it; clean texts are left out entirely
+    flagged_texts = {}
+    for text, issues in zip(unique_texts, check_texts(unique_texts, spell_checker, progress)):
+        if issues:
+            flagged_texts[text] = ("Spell/Grammar Issues:\n" + "\n".join(issues), "; ".join(issues))
+    
+    # Nothing to highlight: return no file, the original can be downloaded
+    # as-is
+    if not flagged_texts:
+        return None, issues_found, total_checked
+    
+    raise_if_cancelled(progress)
     
-    # Process each worksheet
-    for sheet_name in workbook.sheetnames:
-        sheet = workbook[sheet_name]
+    # Re-open the full workbook for the highlights so formatting and
+    # formulas are preserved in the download
+    progress["label"] = "Highlighting cells with issues"
+    progress["fraction"] = 1.0
+    workbook = openpyxl.load_workbook(io.BytesIO(file_bytes), data_only=False)
+    
+    # Highlight the cells with issues, writing only to the flagged cells
+    for sheet_name, sheet_candidates in candidates.items():
+        flagged_cells = []
         
-        st.write(f"Processing sheet: **{sheet_name}**")
-        progress_bar = st.progress(0)
+        for row, col, text in sheet_candidates:
+            flagged = flagged_texts.get(text)
+            if flagged is None:
+                continue
+            comment_text, issues_summary = flagged
+            
+            flagged_cells.append((row, col, comment_text))
+            issues_found['Sheet'].append(sheet_name)
+            issues_found['Cell'].append(f"{get_column_letter(col)}{row}")
+            issues_found['Text'].append(text)
+            issues_found['Issues'].append(issues_summary)
         
-        # Get all cells with data
-        max_row = sheet.max_row
-        max_col = sheet.max_column
+        apply_issues(workbook[sheet_name], flagged_cells, yellow_fill)
+    
+    # Saving a large workbook takes seconds, so it is done here rather than
+    # on the page; only the saved file is kept
+    progress["label"] = "Saving highlighted workbook"
+    return workbook_to_bytes(workbook), issues_found, total_checked
+
+def workbook_to_bytes(workbook):
+    """Save a workbook and return the file contents for download"""
+    output = io.BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+@st.cache_resource
+def load_job_executor():
+    """Start the threads that run workbook checks outside the script reruns"""
+    return ThreadPoolExecutor(max_workers=JOB_THREADS, thread_name_prefix="workbook-check")
+
+def cancel_job(job):
+    """Stop a background check whose results are no longer wanted"""
+    # Not started yet: drop it from the queue. Running: it stops at its next
+    # progress update.
+    job["future"].cancel()
+    job["progress"]["cancelled"] = True
+
+def show_job(job, uploaded_file):
+    """Wait for a background check to finish, then show its results"""
+    future = job["future"]
+    progress = job["progress"]
+    
+    if not future.done():
+        with st.status("Processing workbook... This may take a few minutes for large files.", expanded=True) as status:
+            progress_bar = st.progress(0.0)
+            while not future.done():
+                progress["seen"] = time.monotonic()
+                progress_bar.progress(progress.get("fraction", 0.0), text=progress.get("label"))
+                time.sleep(PROGRESS_INTERVAL)
+            status.update(label="Workbook processed", state="complete", expanded=False)
+    
+    try:
+        # Results of the background check
+        corrected_file, issues_found, total_checked = future.result()
+        df_issues = pd.DataFrame(issues_found)
         
-        cell_count = 0
-        total_cells = max_row * max_col
+        # Show summary
+        st.subheader("📊 Summary")
+        col1, col2, col3 = st.columns(3)
         
-        for row in range(1, max_row + 1):
-            for col in range(1, max_col + 1):
-                cell = sheet.cell(row=row, column=col)
-                
-                # Update progress
-                cell_count += 1
-                if cell_count % 100 == 0:  # Update every 100 cells
-                    progress_bar.progress(min(cell_count / total_cells, 1.0))
-                
-                if cell.value and is_text_content(cell.value):
-                    total_checked += 1
-                    text = str(cell.value).strip()
-                    
-                    # Check for issues
-                    issues = check_spelling_and_grammar(text, spell_checker)
-                    
-                    if issues:
-                        # Highlight the cell
-                        cell.fill = yellow_fill
-                        
-                        # Add comment with issues
-                        if cell.comment:
-                            existing_comment = cell.comment.text
-                            cell.comment.text = f"{existing_comment}\n\nSpell/Grammar Issues:\n" + "\n".join(issues)
-                        else:
-                            cell.comment = openpyxl.comments.Comment(
-                                text=f"Spell/Grammar Issues:\n" + "\n".join(issues),
-                                author="Spell Checker"
-                            )
-                        
-                        issues_found.append({
-                            'Sheet': sheet_name,
-                            'Cell': f"{openpyxl.utils.get_column_letter(col)}{row}",
-                            'Text': text,
-                            'Issues': "; ".join(issues)
-                        })
+        with col1:
+            st.metric("Cells Checked", total_checked)
+        with col2:
+            st.metric("Issues Found", len(df_issues))
+        with col3:
+            accuracy = ((total_checked - len(df_issues)) / total_checked * 100) if total_checked > 0 else 0
+            st.metric("Accuracy", f"{accuracy:.1f}%")
         
-        progress_bar.progress(1.0)
+        # Show issues found
+        if not df_issues.empty:
+            st.subheader("⚠️ Issues Found")
+            st.dataframe(df_issues, use_container_width=True)
+            
+            # Generate filename
+            original_name = uploaded_file.name.rsplit('.', 1)[0]
+            download_name = f"{original_name}_spell_checked.xlsx"
+            
+            st.download_button(
+                label="📥 Download Corrected File",
+                data=corrected_file,
+                file_name=download_name,
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                type="primary"
+            )
+            
+            st.info("💡 **Note:** Cells with issues are highlighted in yellow and include comments with details about the problems found.")
+            
+        else:
+            st.success("🎉 No spelling or grammar issues found!")
+            if not job.get("celebrated"):
+                st.balloons()
+                job["celebrated"] = True
+            
+            # Still offer download of original file
+            original_name = uploaded_file.name.rsplit('.', 1)[0]
+            download_name = f"{original_name}_checked.xlsx"
+            
+            st.download_button(
+                label="📥 Download File",
+                data=uploaded_file.getvalue(),
+                file_name=download_name,
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
+    
+    except CheckCancelled:
+        # Nothing polled the check for a while (the script was stopped)
+        st.warning("The check was stopped before it finished. Click the button to run it again.")
     
-    return workbook, issues_found, total_checked
+    except Exception as e:
+        st.error(f"Error processing file: {str(e)}")
+        st.error("Please make sure you've uploaded a valid Excel file.")
 
 def main():
     st.title("📝 Excel Spell & Grammar Checker")
     st.markdown("Upload an Excel workbook to check for spelling and grammar issues across all sheets.")
     
-    # File upload
+    # File upload. Only .xlsx is accepted: the highlighted copy is written
+    # with openpyxl, which can't open legacy .xls files.
     uploaded_file = st.file_uploader(
         "Choose an Excel file",
-        type=['xlsx', 'xls'],
-        help="Upload an Excel workbook (.xlsx or .xls format)"
+        type=['xlsx'],
+        help="Upload an Excel workbook (.xlsx format)"
     )
     
+    # A check keeps running, and its results stay on the page, across reruns
+    # until a different file is uploaded or the file is removed
+    job = st.session_state.get("check_job")
+    if job is not None and (uploaded_file is None or job["file_id"] != uploaded_file.file_id):
+        cancel_job(job)
+        del st.session_state.check_job
+        job = None
+    
     if uploaded_file is not None:
         st.success(f"File uploaded: {uploaded_file.name}")
         
@@ -180,70 +467,17 @@ def main():
             spell_checker = load_spell_checker()
         
         if st.button("🔍 Check Spelling & Grammar", type="primary"):
-            with st.spinner("Processing workbook... This may take a few minutes for large files."):
-                try:
-                    # Process the workbook
-                    processed_workbook, issues_found, total_checked = process_workbook(uploaded_file, spell_checker)
-                    
-                    # Show summary
-                    st.subheader("📊 Summary")
-                    col1, col2, col3 = st.columns(3)
-                    
-                    with col1:
-                        st.metric("Cells Checked", total_checked)
-                    with col2:
-                        st.metric("Issues Found", len(issues_found))
-                    with col3:
-                        accuracy = ((total_checked - len(issues_found)) / total_checked * 100) if total_checked > 0 else 0
-                        st.metric("Accuracy", f"{accuracy:.1f}%")
-                    
-                    # Show issues found
-                    if issues_found:
-                        st.subheader("⚠️ Issues Found")
-                        df_issues = pd.DataFrame(issues_found)
-                        st.dataframe(df_issues, use_container_width=True)
-                        
-                        # Create download for processed file
-                        output = io.BytesIO()
-                        processed_workbook.save(output)
-                        output.seek(0)
-                        
-                        # Generate filename
-                        original_name = uploaded_file.name.rsplit('.', 1)[0]
-                        download_name = f"{original_name}_spell_checked.xlsx"
-                        
-                        st.download_button(
-                            label="📥 Download Corrected File",
-                            data=output.getvalue(),
-                            file_name=download_name,
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                            type="primary"
-                        )
-                        
-                        st.info("💡 **Note:** Cells with issues are highlighted in yellow and include comments with details about the problems found.")
-                        
-                    else:
-                        st.success("🎉 No spelling or grammar issues found!")
-                        st.balloons()
-                        
-                        # Still offer download of original file
-                        output = io.BytesIO()
-                        processed_workbook.save(output)
-                        output.seek(0)
-                        
-                        original_name = uploaded_file.name.rsplit('.', 1)[0]
-                        download_name = f"{original_name}_checked.xlsx"
-                        
-                        st.download_button(
-                            label="📥 Download File",
-                            data=output.getvalue(),
-                            file_name=download_name,
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                        )
-                
-                except Exception as e:
-                    st.error(f"Error processing file: {str(e)}")
-                    st.error("Please make sure you've uploaded a valid Excel file.")
+            # Clicking again while a check is running keeps the running one
+            if job is None or job["future"].done():
+                progress = {"label": "Starting...", "fraction": 0.0, "seen": time.monotonic()}
+                future = load_job_executor().submit(
+                    process_workbook, uploaded_file.getvalue(), spell_checker, progress
+                )
+                job = {"file_id": uploaded_file.file_id, "future": future, "progress": progress}
+                st.session_state.check_job = job
+        
+        if job is not None:
+            show_job(job, uploaded_file)
     
     # Instructions
     with st.expander("ℹ️ How to use this tool"):
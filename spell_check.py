@@ -0,0 +1,115 @@
+"""Spelling and grammar checks for cell text.
+
+Kept apart from app.py so the worker processes that check large workbooks
+can import it without running the Streamlit script.
+"""
+import re
+from functools import lru_cache
+from spellchecker import SpellChecker
+
+# Patterns used on every cell, compiled once
+_WORD_RE = re.compile(r"[\w'\-]+")
+_MULTI_SPACE_RE = re.compile(r'\s{2,}')
+_NON_SPACE_RE = re.compile(r'\S+')
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+
+# Words a CachedSpellChecker remembers before starting over. Checkers live
+# as long as the server (shared by every session) or a worker process, so
+# without a limit every ID, SKU and typo ever seen would stay in memory.
+WORD_CACHE_SIZE = 200_000
+
+class CachedSpellChecker:
+    """SpellChecker wrapper that remembers words it has already looked up"""
+    
+    def __init__(self, spell_checker):
+        self.spell_checker = spell_checker
+        self.known = set()
+        self.unknown_seen = set()
+    
+    def unknown(self, words):
+        """Return the (lowercased) words that are not in the dictionary"""
+        words = {word.lower() for word in words}
+        
+        # Common vocabulary repeats across cells, so only ask the spell
+        # checker about words it has not classified before
+        misspelled = words & self.unknown_seen
+        candidates = words - self.known - misspelled
+        if candidates:
+            new_misspelled = self.spell_checker.unknown(candidates)
+            
+            # Start over once the sets get too big
+            if len(self.known) + len(self.unknown_seen) > WORD_CACHE_SIZE:
+                self.known.clear()
+                self.unknown_seen.clear()
+            
+            self.known.update(candidates - new_misspelled)
+            self.unknown_seen.update(new_misspelled)
+            misspelled |= new_misspelled
+        
+        return misspelled
+
+def _has_min_words(text, n):
+    """Check if text has at least n words, without splitting all of it"""
+    for count, _ in enumerate(_NON_SPACE_RE.finditer(text), start=1):
+        if count >= n:
+            return True
+    return False
+
+def check_spelling_and_grammar(text, spell_checker):
+    """Check (normalized) text for spelling and grammar issues"""
+    return list(_check_text_cached(text, spell_checker))
+
+# Spreadsheets repeat the same strings a lot (headers, categories, boilerplate),
+# so each distinct text is only checked once per spell checker instance.
+@lru_cache(maxsize=200_000)
+def _check_text_cached(text, spell_checker):
+    """Cached worker for check_spelling_and_grammar; returns a tuple of issues"""
+    issues = []
+    
+    # Words are runs of word characters, apostrophes and hyphens; the spell
+    # checker lowercases them itself
+    words = _WORD_RE.findall(text)
+    
+    # Spelling check with pyspellchecker
+    if spell_checker:
+        misspelled = spell_checker.unknown(words)
+        if misspelled:
+            issues.append(f"Possible misspelled words: {', '.join(list(misspelled)[:3])}")
+    
+    # Basic grammar checks. Every rule needs at least two words, so single
+    # words (codes, names, categories) skip them.
+    if _has_min_words(text, 2):
+        # Multiple consecutive spaces
+        if _MULTI_SPACE_RE.search(text):
+            issues.append("Multiple consecutive spaces found")
+        
+        # Missing capitalization at start of sentence; sentences end at
+        # . ! or ? followed by whitespace
+        for sentence in _SENTENCE_SPLIT_RE.split(text):
+            sentence_str = sentence.strip()
+            if sentence_str and sentence_str[0].islower():
+                # Check if it's not an intentional lowercase start (like an acronym)
+                if _has_min_words(sentence_str, 2):
+                    issues.append("Sentence may need capitalization")
+                break  # Only report once per cell
+        
+        # Check for repeated words
+        words_in_text = text.lower().split()
+        for i in range(len(words_in_text) - 1):
+            if words_in_text[i] == words_in_text[i + 1] and len(words_in_text[i]) > 2:
+                issues.append("Repeated word detected")
+                break  # Only report once per cell
+    
+    return tuple(issues)
+
+# Worker processes build their own spell checker once, via the pool initializer
+_worker_spell_checker = None
+
+def init_worker():
+    """Load a spell checker for this worker process"""
+    global _worker_spell_checker
+    _worker_spell_checker = CachedSpellChecker(SpellChecker())
+
+def check_batch(texts):
+    """Check a list of texts in a worker process"""
+    return [check_spelling_and_grammar(text, _worker_spell_checker) for text in texts]